@@ -34,27 +34,26 @@ rasters = [
     raster_10,
 ]
 
-# Open all sources and merge
+# Merge straight to disk: with dst_path, rasterio (>=1.4) copies the sources
+# into the output chunk by chunk instead of holding the whole mosaic in memory
 srcs = [rasterio.open(p) for p in rasters]
 try:
-    mosaic, transform = merge(srcs)
-
-    meta = srcs[0].meta.copy()
-    meta.update(
-        {
+    merge(
+        srcs,
+        dst_path=out_tif,
+        dst_kwds={
             "driver": "GTiff",
-            "height": mosaic.shape[1],
-            "width": mosaic.shape[2],
-            "transform": transform,
-            "compress": "deflate",
+            "compress": "ZSTD",
+            "zstd_level": 1,
+            "predictor": 2,
             "tiled": True,
+            "blockxsize": 256,
+            "blockysize": 256,
             "bigtiff": "IF_SAFER",
-        }
+            "num_threads": "ALL_CPUS",
+        },
     )
 
-    with rasterio.open(out_tif, "w", **meta) as dst:
-        dst.write(mosaic)
-
     print("Done:", out_tif)
 
 finally:
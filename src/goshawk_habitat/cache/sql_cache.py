@@ -0,0 +1,161 @@
+"""
+Local, content-addressed cache of BCGW query results.
+
+Results are stored as zstd-compressed Parquet files keyed by a SHA-256 of
+the SQL text plus its bind parameters, so re-running a TSA with the same
+query and parameters (e.g. while tuning raster settings) skips Oracle
+entirely. Geometry columns are kept as-is (WKB bytes or GeoJSON text).
+
+Requires pyarrow.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import oracledb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from goshawk_habitat.db.oracle import load_sql, run_sql_stream
+
+# Arrow column types by Oracle type, so every batch of a result is written with
+# the same schema (a batch's own inferred types depend on which values, or
+# nulls, it happens to hold). Large string/binary keep big geometry batches
+# under Arrow's 2 GB per-array offset limit.
+_ARROW_TYPES = {
+    oracledb.DB_TYPE_VARCHAR: pa.large_string(),
+    oracledb.DB_TYPE_NVARCHAR: pa.large_string(),
+    oracledb.DB_TYPE_CHAR: pa.large_string(),
+    oracledb.DB_TYPE_NCHAR: pa.large_string(),
+    oracledb.DB_TYPE_LONG: pa.large_string(),
+    oracledb.DB_TYPE_CLOB: pa.large_string(),
+    oracledb.DB_TYPE_NCLOB: pa.large_string(),
+    oracledb.DB_TYPE_RAW: pa.large_binary(),
+    oracledb.DB_TYPE_LONG_RAW: pa.large_binary(),
+    oracledb.DB_TYPE_BLOB: pa.large_binary(),
+    oracledb.DB_TYPE_DATE: pa.timestamp("us"),
+    oracledb.DB_TYPE_TIMESTAMP: pa.timestamp("us"),
+    oracledb.DB_TYPE_BINARY_FLOAT: pa.float64(),
+    oracledb.DB_TYPE_BINARY_DOUBLE: pa.float64(),
+    oracledb.DB_TYPE_BINARY_INTEGER: pa.int64(),
+    oracledb.DB_TYPE_BOOLEAN: pa.bool_(),
+}
+
+
+def cache_key(sql_text: str, params: dict | None = None) -> str:
+    """SHA-256 of the SQL text and its (sorted) bind parameters."""
+    payload = sql_text + json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _is_fresh(path: Path, ttl_hours: float | None) -> bool:
+    if not path.exists():
+        return False
+    if ttl_hours is None:
+        return True
+    return (time.time() - path.stat().st_mtime) < ttl_hours * 3600
+
+
+def _arrow_type(column) -> pa.DataType | None:
+    """Arrow type for one cursor.description entry; None = infer from data."""
+    _, db_type, _, _, precision, scale, _ = column
+    if db_type == oracledb.DB_TYPE_NUMBER:
+        # NUMBER(p, 0) is an integer; bare NUMBER or a scale means decimals
+        if scale == 0 and 0 < (precision or 0) <= 18:
+            return pa.int64()
+        return pa.float64()
+    return _ARROW_TYPES.get(db_type)
+
+
+def _schema(description, rows) -> pa.Schema:
+    """Schema from the cursor types, inferring any unmapped column from rows."""
+    fields = []
+    for i, column in enumerate(description):
+        typ = _arrow_type(column)
+        if typ is None:
+            typ = pa.array([r[i] for r in rows]).type
+            if pa.types.is_null(typ):
+                typ = pa.large_string()
+        fields.append(pa.field(column[0], typ))
+    return pa.schema(fields)
+
+
+def _write_through(description, batches, path: Path):
+    """
+    Yield each batch unchanged while appending it to a Parquet file. The file
+    is written under a temporary name and only renamed into place once the
+    whole result has been read, so an interrupted or abandoned read never
+    leaves a partial entry.
+    """
+    tmp_path = path.with_suffix(".parquet.tmp")
+    writer = None
+    complete = False
+    try:
+        for rows in batches:
+            if writer is None:
+                schema = _schema(description, rows)
+                writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+            writer.write_table(
+                pa.Table.from_pydict(
+                    {f.name: [r[i] for r in rows] for i, f in enumerate(schema)},
+                    schema=schema,
+                )
+            )
+            yield rows
+        if writer is None:
+            schema = _schema(description, [])
+            writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+        complete = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if complete:
+            tmp_path.replace(path)
+        else:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _read_batches(pf: pq.ParquetFile, batch: int):
+    """Yield a cached result back as row batches, one record batch at a time."""
+    try:
+        for rb in pf.iter_batches(batch_size=batch):
+            yield list(zip(*(c.to_pylist() for c in rb.columns)))
+    finally:
+        pf.close()
+
+
+def run_sql_cached(
+    conn,
+    sql_filename: str,
+    params: dict | None = None,
+    cache_dir: Path = Path("data/.sqlcache"),
+    ttl_hours: float | None = None,
+    batch: int = 5000,
+):
+    """
+    Cached counterpart to oracle.run_sql_stream.
+
+    Returns ``(cols, batches)`` and can be passed anywhere a run_sql_stream
+    result is accepted; only one batch of up to ``batch`` rows is in memory
+    at a time. On a miss the query is streamed from Oracle and each batch is
+    appended to ``cache_dir/<key>.parquet`` as it is handed on; on a hit the
+    file is read back batch by batch. Entries older than ``ttl_hours`` are
+    refreshed (None = never expire).
+    """
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{cache_key(load_sql(sql_filename), params)}.parquet"
+
+    if _is_fresh(path, ttl_hours):
+        pf = pq.ParquetFile(path)
+        return pf.schema_arrow.names, _read_batches(pf, batch)
+
+    description, batches = run_sql_stream(
+        conn, sql_filename, params=params, batch=batch, describe=True
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cols = [c[0] for c in description]
+    return cols, _write_through(description, batches, path)
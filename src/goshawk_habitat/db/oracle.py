@@ -1,9 +1,65 @@
 import os
 import time
 import oracledb
+import shapely
 from contextlib import contextmanager
+from functools import lru_cache
 from importlib.resources import files
 
+# pyarrow is optional; only needed for run_sql_arrow
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Return CLOB/BLOB values as str/bytes rather than LOB locators, so rows don't
+# need a separate round trip per LOB and callers never see oracledb.LOB
+oracledb.defaults.fetch_lobs = False
+
+@lru_cache(maxsize=None)
+def _init_client() -> bool:
+    """
+    Switch python-oracledb to thick mode when Oracle Client libraries can be
+    found (ORACLE_CLIENT_LIB, or the system library path). Thick mode is
+    noticeably faster for large array/LOB fetches over the WAN; if the
+    libraries aren't available we stay in thin mode.
+
+    Runs once, before the first connection (the mode can't change after).
+    """
+    try:
+        oracledb.init_oracle_client(lib_dir=os.environ.get("ORACLE_CLIENT_LIB") or None)
+    except oracledb.Error:
+        return False
+    return True
+
+def _credentials(
+    host: str | None = None,
+    port: int | None = None,
+    service: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+) -> dict:
+    """
+    Resolve connection parameters, falling back to the BCGW_* environment
+    variables, into keyword arguments for oracledb.connect / create_pool.
+    """
+    host = host or os.environ.get("BCGW_HOST")
+    port = port or int(os.environ.get("BCGW_PORT", "1521"))
+    service = service or os.environ.get("BCGW_SERVICE")
+    username = username or os.environ.get("BCGW_USERNAME")
+    password = password or os.environ.get("BCGW_PASSWORD")
+
+    missing = [k for k, v in {
+        "host": host,
+        "service": service,
+        "username": username,
+        "password": password,
+    }.items() if not v]
+
+    dsn = f"{host}:{port}/{service}"
+
+    return {"user": username, "password": password, "dsn": dsn}
+
 def connect(
         
     host: str | None = None,
@@ -11,6 +67,7 @@ def connect(
     service: str | None = None,
     username: str | None = None,
     password: str | None = None,  
+    pool: oracledb.ConnectionPool | None = None,
 ):
     """
     Essentially just a wrapper for oracledb with some slightly enhanced 
@@ -19,6 +76,8 @@ def connect(
     Create and return an Oracle database connection.
 
     Parameters may be passed explicitly or read from environment variables.
+    If a pool (see make_pool) is supplied, a connection is acquired from it
+    instead of opening a new session.
 
     Required env vars (if params not supplied):
       - BCGW_HOST
@@ -27,26 +86,42 @@ def connect(
       - BCGW_USERNAME
       - BCGW_PASSWORD
     """
+    if pool is not None:
+        return pool.acquire()
 
-    host = host or os.environ.get("BCGW_HOST")
-    port = port or int(os.environ.get("BCGW_PORT", "1521"))
-    service = service or os.environ.get("BCGW_SERVICE")
-    username = username or os.environ.get("BCGW_USERNAME")
-    password = password or os.environ.get("BCGW_PASSWORD")
+    _init_client()
+    return oracledb.connect(
+        **_credentials(host, port, service, username, password)
+    )
 
-    missing = [k for k, v in {
-        "host": host,
-        "service": service,
-        "username": username,
-        "password": password,
-    }.items() if not v]
+def _init_session(connection, requested_tag):
+    # Runs once per new pooled session, not on every acquire
+    with connection.cursor() as cur:
+        cur.execute("alter session set nls_numeric_characters = '. '")
 
-    dsn = f"{host}:{port}/{service}"
+def make_pool(
+    host: str | None = None,
+    port: int | None = None,
+    service: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+    min: int = 1,
+    max: int = 4,
+    increment: int = 1,
+) -> oracledb.ConnectionPool:
+    """
+    Create a connection pool against the BCGW so repeated per-TSA work can
+    reuse sessions instead of reconnecting each time.
 
-    return oracledb.connect(
-        user=username,
-        password=password,
-        dsn=dsn,
+    Parameters are resolved the same way as connect().
+    """
+    _init_client()
+    return oracledb.create_pool(
+        **_credentials(host, port, service, username, password),
+        min=min,
+        max=max,
+        increment=increment,
+        session_callback=_init_session,
     )
 
 @contextmanager
@@ -91,12 +166,6 @@ def get_db_latency(connection):
     print("100 round trips took:", round(end - start, 4), "seconds")
     print("Average per round trip:", round((end - start)/100, 6), "seconds")
 
-def output_type_handler(cursor, metadata):
-    # metadata is a sequence of column metadata objects
-    if metadata.type_code == oracledb.DB_TYPE_BLOB:
-        # Return a RAW buffer for BLOBs so the driver gives us bytes directly
-        return cursor.var(oracledb.DB_TYPE_RAW, arraysize=cursor.arraysize)
-
 def get_db_speed(connection, sample_rows=1000, arraysize=10000):
     """
     Test fetch speed + throughput for WKB geometries.
@@ -105,9 +174,6 @@ def get_db_speed(connection, sample_rows=1000, arraysize=10000):
     - arraysize: how many rows to fetch per round-trip (large => fewer round trips)
     Returns a dict of timings + rates.
     """
-    # ensure output type handler is set BEFORE creating cursors
-    connection.outputtypehandler = output_type_handler
-
     sql = f"""
     SELECT
         OBJECTID,
@@ -140,7 +206,7 @@ def get_db_speed(connection, sample_rows=1000, arraysize=10000):
             if not batch:
                 break
             rows += len(batch)
-            # Because of output_type_handler, geom_wkb is now bytes (or None)
+            # With fetch_lobs = False, geom_wkb is already bytes (or None)
             for _, geom_wkb in batch:
                 if geom_wkb:
                     # geom_wkb is bytes; len() is cheap
@@ -175,25 +241,145 @@ def get_db_speed(connection, sample_rows=1000, arraysize=10000):
     finally:
         cur.close()
 
+@lru_cache(maxsize=None)
 def load_sql(sql_filename: str) -> str:
+    # SQL files ship with the package and don't change during a run
     sql_path = files("goshawk_habitat.sql").joinpath(sql_filename)
     return sql_path.read_text(encoding="utf-8")
 
-def run_sql(conn, sql_filename, params=None, arraysize=1000, max_rows=50000):
+def _stream(conn, sql_text, params=None, batch=5000, describe=False):
+    # No output type handler: with fetch_lobs = False BLOBs already arrive as
+    # bytes, and forcing them into a RAW define would cap them at 2000 bytes
+    cur = conn.cursor()
+    try:
+        cur.arraysize = batch
+        # one more than arraysize so the first fetch doesn't need an extra round trip
+        cur.prefetchrows = batch + 1
+        cur.execute(sql_text, params or {})
+        cols = list(cur.description) if describe else [c[0] for c in cur.description]
+    except Exception:
+        cur.close()
+        raise
+
+    def _batches():
+        try:
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cur.close()
+
+    return cols, _batches()
+
+def run_sql_stream(conn, sql_filename, params=None, batch=5000, describe=False):
+    """
+    Execute a packaged SQL file and stream the result set back in batches.
+
+    Returns ``(cols, batches)`` where ``batches`` is a generator yielding lists
+    of up to ``batch`` rows from ``fetchmany``. Only one batch is held in
+    memory at a time; the cursor is closed once the generator is exhausted
+    (or closed early). With ``describe=True``, ``cols`` is the full
+    ``cursor.description`` (name, type, ..., precision, scale, null_ok) rather
+    than just the names.
+    """
+    return _stream(conn, load_sql(sql_filename), params, batch, describe)
+
+def geoms_from_batches(cols, batches, geom_col="GEOM_WKB"):
+    """
+    Decode the WKB geometry column of ``(cols, batches)`` (as returned by
+    run_sql_stream) into shapely geometries.
+
+    Each batch is decoded in one vectorized shapely.from_wkb call; null and
+    empty geometries are skipped.
+    """
+    geom_idx = [c.upper() for c in cols].index(geom_col.upper())
+
+    for rows in batches:
+        for geom in shapely.from_wkb([r[geom_idx] for r in rows]):
+            if geom is not None and not geom.is_empty:
+                yield geom
+
+def run_sql_arrow(conn, sql_filename, params=None, batch=10000):
+    """
+    Execute a packaged SQL file and stream the result back as columnar
+    pyarrow Tables of up to ``batch`` rows each.
+
+    Uses Connection.fetch_df_batches (python-oracledb 3.0+), which fills Arrow
+    buffers directly instead of building a Python tuple per row. Requires
+    pyarrow (see supports_arrow_fetch).
+    """
+    if pa is None:
+        raise ImportError("run_sql_arrow requires pyarrow")
+    if not hasattr(conn, "fetch_df_batches"):
+        raise RuntimeError("run_sql_arrow requires python-oracledb 3.0+")
+
     sql_text = load_sql(sql_filename)
-    conn.outputtypehandler = output_type_handler
+    odfs = conn.fetch_df_batches(
+        statement=sql_text, parameters=params or {}, size=batch
+    )
+    for odf in odfs:
+        yield pa.table(odf)
 
-    with conn.cursor() as cur:
-        cur.arraysize = arraysize
-        cur.execute(sql_text, params or {})
+def supports_arrow_fetch(conn) -> bool:
+    """
+    run_sql_arrow needs pyarrow and Connection.fetch_df_batches
+    (python-oracledb 3.0+).
+    """
+    return pa is not None and hasattr(conn, "fetch_df_batches")
+
+def supports_json_features(conn) -> bool:
+    """JSON_OBJECT(... RETURNING CLOB) with FORMAT JSON needs Oracle 19c+."""
+    return int(conn.version.split(".")[0]) >= 19
+
+def run_sql_features(
+    conn, sql_filename, params=None, batch=5000, geom_col="GEOM_GEOJSON"
+):
+    """
+    Like run_sql_stream, but has Oracle assemble each row into a complete
+    GeoJSON Feature with JSON_OBJECT, so the client only has to concatenate
+    text rather than parse and rebuild every row.
+
+    The packaged query is wrapped as a subquery; every column other than
+    ``geom_col`` becomes a property. Returns ``(["FEATURE_JSON"], batches)``.
+    Requires Oracle 19c+ (see supports_json_features).
+    """
+    sql_text = load_sql(sql_filename).rstrip().rstrip(";")
+
+    # Describe the inner query to find its property columns
+    with oracle_cursor(conn) as cur:
+        cur.parse(sql_text)
         cols = [c[0] for c in cur.description]
 
-        rows = []
-        while len(rows) < max_rows:
-            batch = cur.fetchmany(min(arraysize, max_rows - len(rows)))
-            if not batch:
-                break
-            rows.extend(batch)
+    props = ",\n            ".join(
+        f"KEY '{c}' VALUE q.\"{c}\"" for c in cols if c.upper() != geom_col.upper()
+    )
+    feature_sql = f"""
+    SELECT
+        JSON_OBJECT(
+            'type' VALUE 'Feature',
+            'geometry' VALUE q.{geom_col} FORMAT JSON,
+            'properties' VALUE JSON_OBJECT(
+            {props}
+            NULL ON NULL RETURNING CLOB)
+        NULL ON NULL RETURNING CLOB) AS feature_json
+    FROM (
+    {sql_text}
+    ) q
+    WHERE q.{geom_col} IS NOT NULL
+    """
+    return _stream(conn, feature_sql, params, batch)
+
+def run_sql(conn, sql_filename, params=None, arraysize=5000, max_rows=50000):
+    cols, batches = run_sql_stream(conn, sql_filename, params, batch=arraysize)
+
+    rows = []
+    for batch in batches:
+        rows.extend(batch[: max_rows - len(rows)])
+        if len(rows) >= max_rows:
+            batches.close()
+            break
 
     return cols, rows
 
@@ -0,0 +1,246 @@
+"""
+GeoJSON export for BCGW query results.
+
+Writes FeatureCollections incrementally from the batch/Arrow iterators
+returned by goshawk_habitat.db.oracle, so large result sets never have to
+be held in memory.
+"""
+
+import gc
+import json
+from contextlib import contextmanager
+
+import shapely
+
+from goshawk_habitat.util.log import log_event
+
+# orjson is a much faster drop-in for dumping properties; fall back to the
+# standard library if it isn't installed
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+except ImportError:
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# pyarrow enables the columnar fetch path (oracle.run_sql_arrow)
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Property values that serialize to JSON as-is
+_JSON_SAFE = (str, int, float, bool, type(None))
+
+# WKB from the BCGW queries is in the warehouse's native SRID (BC Albers).
+# GeoJSON readers assume WGS84 unless told otherwise, so WKB-sourced
+# collections carry this legacy "crs" member.
+_WKB_CRS_MEMBER = (
+    b'"crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::3005"}}, '
+)
+
+
+def _feature_bytes(geom_json: str, props: dict) -> bytes:
+    """
+    Encode one Feature. The geometry is already GeoJSON text (from Oracle or
+    GEOS), so it is spliced in verbatim instead of being parsed into Python
+    objects and serialized again; only the properties go through the encoder.
+    """
+    return b"".join(
+        (
+            b'{"type": "Feature", "geometry": ',
+            geom_json.encode("utf-8"),
+            b', "properties": ',
+            _json_dumps(props),
+            b"}",
+        )
+    )
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pause the cyclic garbage collector while streaming features.
+
+    Each feature is a short-lived, acyclic tree of dicts/lists that reference
+    counting frees on its own, but the allocation churn keeps triggering GC
+    passes over everything else that is alive. The previous GC state is
+    restored afterwards.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+        gc.collect()
+
+
+def _write_feature_json(batches, out_path):
+    """
+    Join Features that were already assembled by Oracle (oracle.run_sql_features)
+    into a FeatureCollection; no parsing or rebuilding on the client.
+    """
+    n_features = 0
+    with out_path.open("wb", buffering=1 << 20) as f:
+        f.write(b'{"type": "FeatureCollection", "features": [')
+        for batch in batches:
+            chunk = [r[0].encode("utf-8") for r in batch if r[0]]
+            if not chunk:
+                continue
+            if n_features:
+                f.write(b", ")
+            f.write(b", ".join(chunk))
+            n_features += len(chunk)
+        f.write(b"]}")
+
+    log_event(f"Wrote {n_features:,} features to {out_path}")
+
+
+def generate_geojson(cols, batches, out_path):
+    """
+    Write query results to a GeoJSON FeatureCollection, one feature at a time.
+
+    :param cols: Column names, as returned by oracle.run_sql_stream or
+        oracle.run_sql_features
+    :param batches: Iterable of row batches, as returned by oracle.run_sql_stream
+        or oracle.run_sql_features
+    :param out_path: Destination .geojson path
+    """
+    if [c.lower() for c in cols] == ["feature_json"]:
+        return _write_feature_json(batches, out_path)
+
+    # Find geom column: GeoJSON text (WGS84) or WKB bytes (BC Albers, native SRID)
+    geom_idx = None
+    for i, c in enumerate(cols):
+        if c.lower() in ("geom_geojson", "geom_wkb"):
+            geom_idx = i
+            break
+    if geom_idx is None:
+        raise ValueError(
+            f"Expected 'geom_geojson' or 'geom_wkb' in columns, got: {cols}"
+        )
+    is_wkb = cols[geom_idx].lower() == "geom_wkb"
+
+    # Attribute columns (everything except the geom column), paired with their index
+    prop_idx = [(c, i) for i, c in enumerate(cols) if i != geom_idx]
+
+    n_features = 0
+    with _gc_paused(), out_path.open("wb", buffering=1 << 20) as f:
+        # Stream features straight to disk rather than building the whole
+        # FeatureCollection in memory first
+        f.write(b'{"type": "FeatureCollection", ')
+        if is_wkb:
+            f.write(_WKB_CRS_MEMBER)
+        f.write(b'"features": [')
+        for batch in batches:
+            for r in batch:
+                geom_val = r[geom_idx]
+                if not geom_val:
+                    continue
+
+                if is_wkb:
+                    geom_val = shapely.to_geojson(shapely.from_wkb(geom_val))
+
+                # Build properties without the geom column
+                props = {}
+                for c, i in prop_idx:
+                    v = r[i]
+                    # Dates become ISO strings; anything else unexpected is stringified
+                    if not isinstance(v, _JSON_SAFE):
+                        v = v.isoformat() if hasattr(v, "isoformat") else str(v)
+                    props[c] = v
+
+                if n_features:
+                    f.write(b", ")
+                f.write(_feature_bytes(geom_val, props))
+                n_features += 1
+        f.write(b"]}")
+
+    log_event(f"Wrote {n_features:,} features to {out_path}")
+
+
+def _arrow_safe(typ) -> bool:
+    # Arrow types whose Python values serialize to JSON as-is
+    return (
+        pa.types.is_string(typ)
+        or pa.types.is_large_string(typ)
+        or pa.types.is_integer(typ)
+        or pa.types.is_floating(typ)
+        or pa.types.is_boolean(typ)
+        or pa.types.is_null(typ)
+    )
+
+
+def generate_geojson_arrow(tables, out_path):
+    """
+    Columnar counterpart to generate_geojson for oracle.run_sql_arrow output.
+
+    Property dicts for a whole batch come from Table.to_pylist() (C-implemented)
+    and the geometry column is decoded in one pass, rather than visiting every
+    cell from Python.
+
+    :param tables: Iterable of pyarrow Tables, as returned by oracle.run_sql_arrow
+    :param out_path: Destination .geojson path
+    """
+    n_features = 0
+    header_written = False
+    with _gc_paused(), out_path.open("wb", buffering=1 << 20) as f:
+        for tbl in tables:
+            names = {c.lower(): c for c in tbl.column_names}
+            geom_col = names.get("geom_geojson") or names.get("geom_wkb")
+            if geom_col is None:
+                raise ValueError(
+                    "Expected 'geom_geojson' or 'geom_wkb' in columns, "
+                    f"got: {tbl.column_names}"
+                )
+            is_wkb = geom_col.lower() == "geom_wkb"
+
+            if not header_written:
+                f.write(b'{"type": "FeatureCollection", ')
+                if is_wkb:
+                    f.write(_WKB_CRS_MEMBER)
+                f.write(b'"features": [')
+                header_written = True
+
+            if is_wkb:
+                # WKB -> GeoJSON text for the whole batch in one GEOS call
+                geoms = shapely.to_geojson(
+                    shapely.from_wkb(
+                        tbl.column(geom_col).to_numpy(zero_copy_only=False)
+                    )
+                )
+            else:
+                geoms = tbl.column(geom_col).to_pylist()
+
+            props_tbl = tbl.drop_columns([geom_col])
+            fix_cols = [
+                name
+                for name, typ in zip(props_tbl.column_names, props_tbl.schema.types)
+                if not _arrow_safe(typ)
+            ]
+
+            for geom_val, props in zip(geoms, props_tbl.to_pylist()):
+                if not geom_val:
+                    continue
+
+                # Dates become ISO strings; anything else unexpected is stringified
+                for c in fix_cols:
+                    v = props[c]
+                    if not isinstance(v, _JSON_SAFE):
+                        props[c] = v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+                if n_features:
+                    f.write(b", ")
+                f.write(_feature_bytes(geom_val, props))
+                n_features += 1
+
+        if not header_written:
+            f.write(b'{"type": "FeatureCollection", "features": [')
+        f.write(b"]}")
+
+    log_event(f"Wrote {n_features:,} features to {out_path}")
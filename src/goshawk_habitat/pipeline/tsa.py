@@ -0,0 +1,246 @@
+"""
+Per-TSA SQL -> raster workflow.
+
+Lives in the package rather than in scripts/main.py so ProcessPoolExecutor
+workers can import it: spawned children can't load functions defined in an
+interactive (# %% cell) __main__.
+"""
+
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import rasterio
+
+import goshawk_habitat.db.oracle as bcgw
+import goshawk_habitat.rast.raster as raster
+from goshawk_habitat.io.geojson import generate_geojson, generate_geojson_arrow
+from goshawk_habitat.util.log import configure_logging, log_event
+
+
+def _log_raster_stats(path: Path, label: str) -> None:
+    with rasterio.open(path) as src:
+        dtype = np.dtype(src.dtypes[0])
+        # Small unsigned rasters (e.g. uint8 class rasters) can be histogrammed
+        # with bincount in one linear pass instead of sorting via np.unique
+        small_uint = dtype.kind == "u" and dtype.itemsize <= 2
+        if small_uint:
+            counts = np.zeros(1 << (8 * dtype.itemsize), dtype=np.int64)
+        else:
+            counts = Counter()
+
+        # Accumulate block by block so the full raster is never held in memory
+        for _, window in src.block_windows(1):
+            block = src.read(1, window=window)
+            if small_uint:
+                counts += np.bincount(block.ravel(), minlength=counts.size)
+            else:
+                vals, cnts = np.unique(block, return_counts=True)
+                counts.update(dict(zip(vals.tolist(), cnts.tolist())))
+
+        if small_uint:
+            unique_vals = {v: c for v, c in enumerate(counts.tolist()) if c}
+        else:
+            unique_vals = dict(sorted(counts.items()))
+
+        log_event(
+            f"{label} – dtype={dtype}, nodata={src.nodata}, "
+            f"min/max={min(unique_vals)}/{max(unique_vals)}, unique values: "
+            f"{', '.join(f'{k}: {v:,}' for k, v in unique_vals.items())}"
+        )
+
+# Per-process connection pool, created by init_worker in each child process;
+# None in the parent, where process_tsa opens a plain connection instead
+_pool = None
+
+def init_worker(log_file: Path) -> None:
+    """
+    Initializer for ProcessPoolExecutor workers.
+
+    Points the child at the parent's log file and opens a small connection
+    pool the worker reuses for every TSA it processes.
+    """
+    global _pool
+    configure_logging(log_file)
+    _pool = bcgw.make_pool(min=1, max=1)
+
+def process_tsa(
+    tsa_id: int,
+    cfg: dict,
+    grid_cfg: raster.GridConfig,
+    root: Path,
+    debug_geojson: bool = False,
+) -> tuple[Path, Path]:
+    """
+    Run the SQL -> raster workflow for a single TSA.
+
+    :param tsa_id: TSA FEATURE_ID to process
+    :param cfg: Parsed config.toml
+    :param grid_cfg: Raster settings shared by every TSA
+    :param root: Project root; inputs and outputs live under root / "data"
+    :param debug_geojson: Write the BCGW nesting polygons to GeoJSON and
+        rasterize from that file instead of straight from the cursor
+    :return: Paths to the nesting and foraging rasters
+    """
+    r_cfg = cfg["raster"]
+
+    tsa_params = {
+        "tsa_id": tsa_id
+    }
+    
+    nest_params = {
+        "tsa_id": tsa_id,
+        "min_age": cfg["nesting_vri_params"]["proj_age_1"],
+        "min_height": cfg["nesting_vri_params"]["proj_height"],
+        "min_crown_closure": cfg["nesting_vri_params"]["crown_closure"],
+        "max_site_index": cfg["nesting_vri_params"]["site_index"],
+        "tol":cfg["geoprocessing"]["tol"],
+        "simplify_tol": cfg["geoprocessing"]["simplify_tol"],
+    }
+
+    forage_params = {
+         "tsa_id": tsa_id,
+         "min_age": cfg["foraging_vri_params"]["proj_age_1"],
+         "tol":cfg["geoprocessing"]["tol"],
+         "simplify_tol": cfg["geoprocessing"]["simplify_tol"],
+         "min_disturbance_year":cfg["foraging_vri_params"]["min_disturbance_year"]
+    }
+
+    data_prep_params = {
+        "tsa_id": tsa_id,
+        "tol":cfg["geoprocessing"]["tol"], 
+        "min_age": cfg["foraging_vri_params"]["proj_age_1"],
+    }
+
+    use_bcgw = cfg.get("sources", {}).get("vectors", "modelbuilder") == "bcgw"
+
+    # Optionally serve repeat nesting/foraging queries from the local Parquet cache
+    cache_cfg = cfg.get("cache", {})
+    use_cache = bool(cache_cfg.get("enabled", False))
+    if use_cache:
+        from goshawk_habitat.cache import sql_cache
+
+        fetch = partial(
+            sql_cache.run_sql_cached,
+            cache_dir=root / cache_cfg.get("dir", "data/.sqlcache"),
+            ttl_hours=cache_cfg.get("ttl_hours"),
+        )
+    else:
+        fetch = bcgw.run_sql_stream
+
+    conn = bcgw.connect(pool=_pool)
+    try:
+        # -------------------------
+        # TSA GeoJSON Creation and Grid Creation
+        # -------------------------
+        # Oracle 19c+ builds the GeoJSON Features itself; older versions fall
+        # back to assembling them row by row in generate_geojson
+        if bcgw.supports_json_features(conn):
+            run_query = bcgw.run_sql_features
+        else:
+            run_query = bcgw.run_sql_stream
+
+        log_event(f"Running TSA SQL Query for TSA {tsa_params['tsa_id']}")
+        cols, batches = run_query(conn, "TSA.sql", params=tsa_params)
+
+        log_event(f"Creating TSA GeoJSON for TSA {tsa_params['tsa_id']}")
+        tsa_geojson_path = root / "data" / f"tsa_{tsa_id}.geojson"
+        generate_geojson(cols, batches, tsa_geojson_path)
+
+        # Create the canonical grid (this is what makes all rasters align)
+        log_event("Creating canonical RasterGrid from TSA GeoJSON")
+        grid = raster.RasterGrid.from_geojson_aoi(
+            aoi_geojson_path=tsa_geojson_path,
+            config=grid_cfg,  # <-- THIS MUST BE GridConfig, not dict
+            aoi_crs_if_missing=r_cfg.get("geojson_crs_if_missing", "EPSG:4326"),
+            pad_pixels=int(r_cfg.get("pad_pixels", 0)),
+        )
+
+        log_event(
+            f"Grid created – CRS={grid.crs}, pixel={grid.pixel_size}, "
+            f"origin=({grid.extent.xmin}, {grid.extent.ymax}), "
+            f"size={grid.width}x{grid.height}"
+        )
+
+        # -------------------------
+        # Nesting raster (ALIGNED)
+        # -------------------------
+        log_event(
+            f"Creating Nesting TIF for TSA {nest_params['tsa_id']} "
+            "(aligned to canonical grid)"
+        )
+        nest_raster_out_path = root / "data" / f"nest_raster_{tsa_id}.tif"
+        nesting_geojson_path = None
+        if use_bcgw:
+            log_event(f"Running Nesting SQL Query for TSA {nest_params['tsa_id']}")
+            cols, batches = fetch(conn, "nesting.sql", params=nest_params)
+            if debug_geojson:
+                # Keep the polygons on disk and rasterize from that file, so the
+                # query still only runs once
+                log_event(f"Creating Nesting GeoJSON for TSA {tsa_id} (debug)")
+                nesting_geojson_path = root / "data" / f"nesting_{tsa_id}.geojson"
+                generate_geojson(cols, batches, nesting_geojson_path)
+            else:
+                # Rasterize straight from the cursor; no intermediate GeoJSON on disk
+                geoms = bcgw.geoms_from_batches(cols, batches)
+                grid.rasterize_features_stream(
+                    shapes=((geom, 1) for geom in geoms),
+                    out_tif_path=nest_raster_out_path,
+                )
+        else:
+            nesting_geojson_path = root / "data" / "Nesting_Modelbuilder.geojson"
+
+        if nesting_geojson_path is not None:
+            grid.rasterize_geojson_binary(
+                geojson_path=nesting_geojson_path,
+                out_tif_path=nest_raster_out_path,
+                geojson_crs_if_missing=r_cfg.get("geojson_crs_if_missing", "EPSG:4326"),
+                burn_value=1,
+            )
+        _log_raster_stats(nest_raster_out_path, "Nesting TIF Created")
+
+
+        # -------------------------
+        # Foraging raster (ALIGNED)
+        # -------------------------
+        if use_bcgw:
+            # Age classes need every polygon up front to order overlaps, so the
+            # foraging polygons still go through a GeoJSON file
+            log_event(f"Running Foraging SQL Query for TSA {forage_params['tsa_id']}")
+            foraging_geojson_path = root / "data" / f"foraging_{tsa_id}.geojson"
+            if bcgw.supports_arrow_fetch(conn) and not use_cache:
+                tables = bcgw.run_sql_arrow(
+                    conn, "foraging_2.sql", params=forage_params
+                )
+
+                log_event(f"Creating Foraging GeoJSON for TSA {tsa_id}")
+                generate_geojson_arrow(tables, foraging_geojson_path)
+            else:
+                cols, batches = fetch(conn, "foraging_2.sql", params=forage_params)
+
+                log_event(f"Creating Foraging GeoJSON for TSA {tsa_id}")
+                generate_geojson(cols, batches, foraging_geojson_path)
+        else:
+            foraging_geojson_path = root / "data" / "Foraging_Modelbuilder.geojson"
+    finally:
+        conn.close()
+
+    log_event(
+        f"Creating Foraging TIF for TSA {forage_params['tsa_id']} "
+        "(aligned to canonical grid)"
+    )
+    forage_raster_out_path = root / "data" / f"forage_raster_{tsa_id}.tif"
+    grid.rasterize_geojson_age_classes(
+        geojson_path=foraging_geojson_path,
+        out_tif_path=forage_raster_out_path,
+        age_field="PROJ_AGE_1",
+        geojson_crs_if_missing=r_cfg.get("geojson_crs_if_missing", "EPSG:4326"),
+        # If you're using nodata=255 (recommended for ArcGIS when 0 is a valid class),
+        # keep it in config.toml as raster.nodata=255 and you can omit these:
+        nodata=int(r_cfg.get("forage_nodata", grid_cfg.nodata)),
+        dtype=str(r_cfg.get("forage_dtype", grid_cfg.dtype)),
+    )
+    _log_raster_stats(forage_raster_out_path, "Foraging TIF Created")
+
+    return nest_raster_out_path, forage_raster_out_path
@@ -15,23 +15,52 @@ Refactor of the original free functions into a small, reusable module that:
 Dependencies:
     geopandas
     shapely
+    pyproj
     numpy
     rasterio
+    numba (optional, compiled scanline fill for binary masks)
+    rio-cogeo (optional, Cloud-Optimized GeoTIFF output)
 """
 
 from __future__ import annotations
 
+import math
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Union
 
-import math
-import numpy as np
 import geopandas as gpd
+import numpy as np
+import pyproj
 import rasterio
-from rasterio.features import rasterize
-from rasterio.transform import from_origin, Affine
+import shapely
+from rasterio import windows
 from rasterio.crs import CRS
+from rasterio.features import rasterize
+from rasterio.transform import Affine, from_origin
+from rasterio.windows import Window
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    from rio_cogeo.cogeo import cog_translate
+except ImportError:
+    cog_translate = None
+
+# pyogrio can hand back Arrow buffers instead of building rows when pyarrow is present
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 
 PathLike = Union[str, Path]
@@ -41,19 +70,29 @@ PathLike = Union[str, Path]
 # Config + helpers
 # ----------------------------
 
+
 @dataclass(frozen=True)
 class GridConfig:
     """Stable raster settings you want consistent across outputs."""
+
     out_crs: Union[str, CRS] = "EPSG:3005"  # BC Albers (meters)
     pixel_size: float = 30.0
     all_touched: bool = False
     nodata: int = 0
     dtype: str = "uint8"
-    compress: str = "DEFLATE"
+    compress: str = "ZSTD"
+    zstd_level: int = 1  # fast write, still smaller than DEFLATE for class rasters
+    # GDAL compression threads; set None to omit
+    num_threads: Optional[str] = "ALL_CPUS"
     tiled: bool = True
     blockxsize: int = 256
     blockysize: int = 256
     predictor: Optional[int] = 2  # good for integer rasters; set None to omit
+    # <8 stores uint8 rasters as GTiff NBITS when all values (incl. nodata) fit
+    packed_bits: int = 8
+    # write Cloud-Optimized GeoTIFFs (needs rio-cogeo; plain tiled GeoTIFF otherwise)
+    cog: bool = False
+    overview_level: int = 5  # internal overview levels when cog=True
 
 
 @dataclass(frozen=True)
@@ -64,24 +103,87 @@ class GridExtent:
     ymax: float
 
 
+# shapely.get_type_id codes for Polygon / MultiPolygon
+_POLYGON_TYPE_IDS = (3, 6)
+
+
 def _ensure_crs(crs: Union[str, CRS]) -> CRS:
     return crs if isinstance(crs, CRS) else CRS.from_user_input(crs)
 
 
+@lru_cache(maxsize=None)
+def _get_transformer(src_wkt: str, dst_wkt: str) -> pyproj.Transformer:
+    """Build a transformer once per CRS pair; PROJ setup is the expensive part."""
+    return pyproj.Transformer.from_crs(src_wkt, dst_wkt, always_xy=True)
+
+
+# Below this many vertices a single transform call beats thread start-up
+_PARALLEL_MIN_COORDS = 200_000
+
+
+def _transform_coords(
+    transformer: pyproj.Transformer, xy: np.ndarray, max_workers: Optional[int] = None
+) -> np.ndarray:
+    """
+    Transform an (N, 2) coordinate array. Large arrays are split into chunks
+    transformed on a thread pool; PROJ releases the GIL for array transforms,
+    so the chunks genuinely run in parallel.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(xy) < _PARALLEL_MIN_COORDS:
+        return np.column_stack(transformer.transform(xy[:, 0], xy[:, 1]))
+
+    out = np.empty_like(xy)
+
+    def _run(chunk: slice) -> None:
+        out[chunk, 0], out[chunk, 1] = transformer.transform(xy[chunk, 0], xy[chunk, 1])
+
+    edges = np.linspace(0, len(xy), max_workers + 1, dtype=np.int64)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(_run, [slice(a, b) for a, b in zip(edges[:-1], edges[1:])]))
+    return out
+
+
+def _read_vector(
+    path: PathLike, columns: list, crs_if_missing: Union[str, CRS]
+) -> gpd.GeoDataFrame:
+    """
+    Read only the geometry plus `columns` (all other attributes are skipped at
+    the source).
+    """
+    gdf = gpd.read_file(
+        path, engine="pyogrio", columns=columns, use_arrow=pa is not None
+    )
+    if gdf.crs is None:
+        gdf = gdf.set_crs(crs_if_missing)
+    return gdf
+
+
 def _clean_polygons(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-    """Keep only polygonal geometries, drop empties/nulls, and attempt simple repairs."""
-    gdf = gdf[gdf.geometry.notnull()].copy()
-    gdf = gdf[~gdf.geometry.is_empty].copy()
-    gdf = gdf[gdf.geom_type.isin(["Polygon", "MultiPolygon"])].copy()
-    if gdf.empty:
+    """
+    Keep only polygonal geometries, drop empties/nulls, and attempt simple
+    repairs.
+    """
+    # One vectorized pass over the geometry array instead of a chain of pandas filters
+    geoms = gdf.geometry.to_numpy()
+    keep = (
+        ~shapely.is_missing(geoms)
+        & ~shapely.is_empty(geoms)
+        & np.isin(shapely.get_type_id(geoms), _POLYGON_TYPE_IDS)
+    )
+    if not keep.any():
         raise ValueError("No Polygon/MultiPolygon geometries found after filtering.")
-    # Simple repair for common invalids
-    gdf["geometry"] = gdf.geometry.buffer(0)
+    # Repair invalids; "structure" keeps polygonal input polygonal
+    # (no stray lines/points)
+    fixed = shapely.make_valid(geoms[keep], method="structure", keep_collapsed=False)
     # Drop any that became empty after repair
-    gdf = gdf[gdf.geometry.notnull() & ~gdf.geometry.is_empty].copy()
-    if gdf.empty:
+    valid = ~shapely.is_empty(fixed)
+    if not valid.any():
         raise ValueError("All geometries became empty/invalid after repair.")
-    return gdf
+    gdf = gdf.iloc[np.flatnonzero(keep)[valid]]
+    return gdf.assign(
+        geometry=gpd.GeoSeries(fixed[valid], index=gdf.index, crs=gdf.crs)
+    )
 
 
 def _snap_bounds(bounds, pixel_size: float) -> GridExtent:
@@ -92,15 +194,170 @@ def _snap_bounds(bounds, pixel_size: float) -> GridExtent:
     maxx = math.ceil(maxx / pixel_size) * pixel_size
     maxy = math.ceil(maxy / pixel_size) * pixel_size
 
-    # FIX: use xmin/ymin field names
     return GridExtent(xmin=minx, ymin=miny, xmax=maxx, ymax=maxy)
 
 
+def _blank(out_shape, fill, dtype) -> np.ndarray:
+    """
+    Background buffer; a zero fill comes straight from calloc'd pages, no
+    memset pass.
+    """
+    if fill == 0:
+        return np.zeros(out_shape, dtype=dtype)
+    return np.full(out_shape, fill, dtype=dtype)
+
+
+def _flatten_polygons(geoms: np.ndarray):
+    """
+    Flatten (Multi)Polygons into one vertex array plus offsets, using shapely's
+    vectorized accessors:
+        xy[ring_offsets[r]:ring_offsets[r + 1]]   -> vertices of ring r
+        geom_rings[g]:geom_rings[g + 1]           -> rings of geometry g
+    """
+    parts, part_geom = shapely.get_parts(geoms, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    xy, vert_ring = shapely.get_coordinates(rings, return_index=True)
+
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(vert_ring, minlength=len(rings)), out=ring_offsets[1:])
+    geom_rings = np.zeros(len(geoms) + 1, dtype=np.int64)
+    np.cumsum(
+        np.bincount(part_geom[ring_part], minlength=len(geoms)), out=geom_rings[1:]
+    )
+    return xy, ring_offsets, geom_rings
+
+
+if njit is not None:
+
+    @njit(cache=True, parallel=True, nogil=True)
+    def _scanline_rasterize(
+        xy, ring_offsets, geom_rings, values, out, inv_ps, x_off, y_off
+    ):
+        """
+        Even-odd scanline fill of polygons into `out` (burned in place).
+
+        Mirrors GDAL's non-all_touched polygon fill: a pixel is burned when its
+        centre falls inside the polygon, edges are half-open, and horizontal
+        edges lying exactly on a row centre are burned only when they run
+        right-to-left with the ring taken clockwise (GDAL's result does not
+        depend on the stored ring orientation). Geometries are burned in
+        order, so later values overwrite earlier ones exactly as rasterio would.
+
+        World -> pixel is px = x_off + x * inv_ps, py = y_off - y * inv_ps
+        (inv_ps = 1 / pixel size, x_off = -xmin / pixel size,
+        y_off = ymax / pixel size for the top-left corner of `out`): one
+        multiply-add per coordinate, and the same arithmetic as GDAL's inverse
+        geotransform, so vertices sitting on pixel centres resolve identically.
+        """
+        height, width = out.shape
+        n_geoms = values.shape[0]
+
+        # world -> pixel coordinates, once per vertex
+        n_verts = xy.shape[0]
+        px = np.empty(n_verts)
+        py = np.empty(n_verts)
+        for k in prange(n_verts):
+            px[k] = x_off + xy[k, 0] * inv_ps
+            py[k] = y_off - xy[k, 1] * inv_ps
+
+        # ring orientation: shoelace sum in pixel space is positive for rings
+        # that are clockwise in world space
+        n_rings = ring_offsets.shape[0] - 1
+        ring_cw = np.empty(n_rings, dtype=np.bool_)
+        for ring in prange(n_rings):
+            area2 = 0.0
+            for k in range(ring_offsets[ring], ring_offsets[ring + 1] - 1):
+                area2 += px[k] * py[k + 1] - px[k + 1] * py[k]
+            ring_cw[ring] = area2 > 0.0
+
+        # bucket edges by the rows whose centre they can cross (CSR: the edges
+        # of row r are row_edges[row_start[r]:row_start[r + 1]]), so each row
+        # only visits its own edges rather than every edge of every geometry.
+        # Edges are bucketed in order, so within a row they stay grouped by
+        # geometry in burn order.
+        edge_ring = np.empty(n_verts, dtype=np.int64)
+        edge_geom = np.empty(n_verts, dtype=np.int64)
+        edge_r0 = np.zeros(n_verts, dtype=np.int64)
+        edge_r1 = np.full(n_verts, -1, dtype=np.int64)
+        row_start = np.zeros(height + 1, dtype=np.int64)
+        for g in range(n_geoms):
+            for ring in range(geom_rings[g], geom_rings[g + 1]):
+                for k in range(ring_offsets[ring], ring_offsets[ring + 1] - 1):
+                    edge_ring[k] = ring
+                    edge_geom[k] = g
+                    r0 = max(int(math.ceil(min(py[k], py[k + 1]) - 0.5)), 0)
+                    r1 = min(int(math.floor(max(py[k], py[k + 1]) - 0.5)), height - 1)
+                    edge_r0[k] = r0
+                    edge_r1[k] = r1
+                    for r in range(r0, r1 + 1):
+                        row_start[r + 1] += 1
+        for r in range(height):
+            row_start[r + 1] += row_start[r]
+        row_edges = np.empty(row_start[height], dtype=np.int64)
+        fill = row_start[:-1].copy()
+        for k in range(n_verts):
+            for r in range(edge_r0[k], edge_r1[k] + 1):
+                row_edges[fill[r]] = k
+                fill[r] += 1
+
+        for r in prange(height):
+            yc = r + 0.5
+            i = row_start[r]
+            end = row_start[r + 1]
+            xs = np.empty(end - i)
+            while i < end:
+                g = edge_geom[row_edges[i]]
+                val = values[g]
+
+                # x-intersections of this geometry's edges with the row centre
+                n = 0
+                while i < end and edge_geom[row_edges[i]] == g:
+                    k = row_edges[i]
+                    i += 1
+                    y0 = py[k]
+                    y1 = py[k + 1]
+                    if y0 == y1:
+                        # horizontal edge on the row centre
+                        if (px[k] > px[k + 1]) == ring_cw[edge_ring[k]]:
+                            c0 = max(int(math.floor(min(px[k], px[k + 1]) + 0.5)), 0)
+                            c1 = min(
+                                int(math.floor(max(px[k], px[k + 1]) + 0.5)), width
+                            )
+                            for col in range(c0, c1):
+                                out[r, col] = val
+                        continue
+                    if y0 < y1:
+                        dy1, dy2, dx1, dx2 = y0, y1, px[k], px[k + 1]
+                    else:
+                        dy1, dy2, dx1, dx2 = y1, y0, px[k + 1], px[k]
+                    if dy1 <= yc < dy2:
+                        xs[n] = (yc - dy1) * (dx2 - dx1) / (dy2 - dy1) + dx1
+                        n += 1
+
+                # few crossings per row, so insertion sort beats anything fancier
+                for j in range(1, n):
+                    x = xs[j]
+                    m = j - 1
+                    while m >= 0 and xs[m] > x:
+                        xs[m + 1] = xs[m]
+                        m -= 1
+                    xs[m + 1] = x
+
+                for j in range(0, n - 1, 2):
+                    c0 = max(int(math.floor(xs[j] + 0.5)), 0)
+                    c1 = min(int(math.floor(xs[j + 1] + 0.5)), width)
+                    for col in range(c0, c1):
+                        out[r, col] = val
+
+else:
+    _scanline_rasterize = None
+
 
 # ----------------------------
 # Canonical raster grid object
 # ----------------------------
 
+
 class RasterGrid:
     """
     Canonical, snapped grid definition built from an AOI GeoJSON.
@@ -123,10 +380,26 @@ class RasterGrid:
         self.width = int(round(width))
         self.height = int(round(height))
         if self.width <= 0 or self.height <= 0:
-            raise ValueError(f"Invalid grid dimensions: width={self.width}, height={self.height}")
+            raise ValueError(
+                f"Invalid grid dimensions: width={self.width}, height={self.height}"
+            )
 
         # top-left origin (xmin, ymax)
-        self.transform: Affine = from_origin(extent.xmin, extent.ymax, self.pixel_size, self.pixel_size)
+        self.transform: Affine = from_origin(
+            extent.xmin, extent.ymax, self.pixel_size, self.pixel_size
+        )
+
+        self._pyproj_crs = pyproj.CRS.from_user_input(self.crs)
+        # world -> pixel scale for the scanline kernel, computed once per grid
+        self._inv_ps = 1.0 / self.pixel_size
+
+        if config.cog and cog_translate is None:
+            warnings.warn(
+                "GridConfig.cog is set but rio-cogeo is not installed; "
+                "writing plain tiled GeoTIFFs instead (pip install .[cog])",
+                RuntimeWarning,
+                stacklevel=2,
+            )
 
     @classmethod
     def from_geojson_aoi(
@@ -140,7 +413,7 @@ class RasterGrid:
         Create a grid from an AOI GeoJSON by:
         - reading AOI,
         - ensuring its CRS,
-        - reprojecting to config.out_crs,
+        - reprojecting its vertices to config.out_crs,
         - taking bounds and snapping to pixel grid,
         - optional padding by N pixels.
         """
@@ -148,14 +421,32 @@ class RasterGrid:
         if not aoi_geojson_path.exists():
             raise FileNotFoundError(f"AOI GeoJSON not found: {aoi_geojson_path}")
 
-        gdf = gpd.read_file(aoi_geojson_path)
-        if gdf.crs is None:
-            gdf = gdf.set_crs(aoi_crs_if_missing)
+        gdf = _read_vector(aoi_geojson_path, [], aoi_crs_if_missing)
+        src_crs = gdf.crs
+
+        # Only the extent matters here, so skip repairing/reprojecting the
+        # geometries and transform their raw vertices instead
+        geoms = gdf.geometry.to_numpy()
+        geoms = geoms[
+            np.isin(shapely.get_type_id(geoms), _POLYGON_TYPE_IDS)
+            & ~shapely.is_empty(geoms)
+        ]
+        if len(geoms) == 0:
+            raise ValueError(
+                "No Polygon/MultiPolygon geometries found after filtering."
+            )
+        xy = shapely.get_coordinates(geoms)
 
-        gdf = _clean_polygons(gdf)
-        gdf = gdf.to_crs(_ensure_crs(config.out_crs))
+        src_crs = pyproj.CRS.from_user_input(src_crs)
+        dst_crs = pyproj.CRS.from_user_input(_ensure_crs(config.out_crs))
+        if src_crs != dst_crs:
+            transformer = _get_transformer(src_crs.to_wkt(), dst_crs.to_wkt())
+            xy = _transform_coords(transformer, xy)
+        xs, ys = xy[:, 0], xy[:, 1]
 
-        extent = _snap_bounds(gdf.total_bounds, config.pixel_size)
+        extent = _snap_bounds(
+            (xs.min(), ys.min(), xs.max(), ys.max()), config.pixel_size
+        )
 
         if pad_pixels > 0:
             pad = pad_pixels * config.pixel_size
@@ -168,7 +459,12 @@ class RasterGrid:
 
         return cls(config=config, extent=extent)
 
-    def profile(self) -> dict:
+    @cached_property
+    def _base_profile(self) -> Mapping:
+        """
+        Write profile for THIS grid, built once. Read-only (GridConfig is
+        frozen, so nothing here can go stale); copy it before adjusting.
+        """
         prof = {
             "driver": "GTiff",
             "height": self.height,
@@ -183,10 +479,263 @@ class RasterGrid:
             "blockxsize": self.config.blockxsize,
             "blockysize": self.config.blockysize,
         }
+        if self.config.compress.upper() == "ZSTD":
+            prof["zstd_level"] = self.config.zstd_level
         if self.config.predictor is not None:
-            # only meaningful for some compressions; safe to include for DEFLATE/LZW in many cases
+            # only meaningful for some compressions; safe for ZSTD/DEFLATE/LZW
             prof["predictor"] = self.config.predictor
-        return prof
+        if self.config.num_threads is not None:
+            prof["num_threads"] = self.config.num_threads
+        return MappingProxyType(prof)
+
+    def profile(self) -> dict:
+        return dict(self._base_profile)
+
+    def _reproject(
+        self, gdf: gpd.GeoDataFrame, max_workers: Optional[int] = None
+    ) -> gpd.GeoDataFrame:
+        """
+        Reproject gdf to the grid CRS, reusing a cached transformer. All
+        vertices are pulled out as one array, transformed (multithreaded for
+        large inputs) and written back in a single vectorized pass.
+        """
+        if gdf.crs == self._pyproj_crs:
+            return gdf
+        transformer = _get_transformer(gdf.crs.to_wkt(), self._pyproj_crs.to_wkt())
+
+        # set_coordinates fills the array in place
+        geoms = gdf.geometry.to_numpy().copy()
+        xy = _transform_coords(transformer, shapely.get_coordinates(geoms), max_workers)
+        geoms = shapely.set_coordinates(geoms, xy)
+        return gdf.assign(geometry=gpd.GeoSeries(geoms, index=gdf.index, crs=self.crs))
+
+    @contextmanager
+    def _open_output(self, out_tif_path: Path, profile: dict):
+        """
+        Open out_tif_path for writing with profile. With config.cog the pixels
+        go to a scratch GeoTIFF that is converted on close to a COG with
+        internal overviews, so small-window reads touch only the tiles they need.
+        """
+        out_tif_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.config.cog or cog_translate is None:
+            with rasterio.open(out_tif_path, "w", **profile) as dst:
+                yield dst
+            return
+
+        tmp_path = out_tif_path.with_name(
+            f"{out_tif_path.stem}.tmp{out_tif_path.suffix}"
+        )
+        cog_keys = (
+            "compress",
+            "zstd_level",
+            "predictor",
+            "nbits",
+            "tiled",
+            "blockxsize",
+            "blockysize",
+        )
+        cog_profile = {"driver": "GTiff", "interleave": "pixel"}
+        cog_profile.update({k: profile[k] for k in cog_keys if k in profile})
+        try:
+            with rasterio.open(tmp_path, "w", **profile) as dst:
+                yield dst
+            cog_translate(
+                tmp_path,
+                out_tif_path,
+                cog_profile,
+                overview_level=self.config.overview_level,
+                overview_resampling="nearest",  # class rasters: never blend values
+                config={"GDAL_NUM_THREADS": profile.get("num_threads", "ALL_CPUS")},
+                quiet=True,
+            )
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _packed(self, profile: dict, max_value: int) -> dict:
+        """
+        Return profile with NBITS set when config.packed_bits asks for sub-byte
+        storage and every value written (burns and nodata) fits in that width;
+        otherwise profile is returned unchanged.
+        """
+        if profile["dtype"] != "uint8" or self.config.packed_bits >= 8:
+            return profile
+        nbits = max(self.config.packed_bits, int(max_value).bit_length(), 1)
+        if nbits >= 8:
+            return profile
+        profile = dict(profile, nbits=nbits)
+        # GDAL only supports the horizontal predictor on whole-byte samples
+        profile.pop("predictor", None)
+        return profile
+
+    def _tile_offsets(self) -> np.ndarray:
+        """
+        (N, 4) array of (col_off, row_off, width, height), one row per output
+        block (blockxsize x blockysize tiles, row-major).
+        """
+        bx, by = self.config.blockxsize, self.config.blockysize
+        rows, cols = np.meshgrid(
+            np.arange(0, self.height, by), np.arange(0, self.width, bx), indexing="ij"
+        )
+        rows, cols = rows.ravel(), cols.ravel()
+        return np.column_stack(
+            (
+                cols,
+                rows,
+                np.minimum(bx, self.width - cols),
+                np.minimum(by, self.height - rows),
+            )
+        )
+
+    def _tile_bounds(self, offsets: np.ndarray) -> np.ndarray:
+        """
+        World bounds (left, bottom, right, top) of every tile in one numpy
+        pass; same arithmetic as rasterio.windows.bounds, without a Python
+        call per window.
+        """
+        t = self.transform
+        col0, row0 = offsets[:, 0], offsets[:, 1]
+        col1, row1 = col0 + offsets[:, 2], row0 + offsets[:, 3]
+        return np.column_stack(
+            (
+                col0 * t.a + row1 * t.b + t.c,
+                col0 * t.d + row1 * t.e + t.f,
+                col1 * t.a + row0 * t.b + t.c,
+                col1 * t.d + row0 * t.e + t.f,
+            )
+        )
+
+    def _burn(
+        self,
+        geoms: np.ndarray,
+        values: np.ndarray,
+        out_shape,
+        transform: Affine,
+        fill,
+        dtype,
+    ) -> np.ndarray:
+        """
+        Burn (Multi)Polygons into a fresh (out_shape) array, later values
+        overwriting earlier ones. Uses the numba scanline kernel when it is
+        available (it matches rasterio with all_touched=False), else rasterio.
+        """
+        arr = _blank(out_shape, fill, dtype)
+        if len(geoms) == 0:
+            return arr
+
+        if (
+            _scanline_rasterize is not None
+            and not self.config.all_touched
+            and np.isin(shapely.get_type_id(geoms), _POLYGON_TYPE_IDS).all()
+        ):
+            # compiled fill; skips serializing every geometry through OGR
+            xy, ring_offsets, geom_rings = _flatten_polygons(geoms)
+            _scanline_rasterize(
+                xy,
+                ring_offsets,
+                geom_rings,
+                np.ascontiguousarray(values, dtype=dtype),
+                arr,
+                self._inv_ps,
+                -transform.c / self.pixel_size,
+                transform.f / self.pixel_size,
+            )
+            return arr
+
+        # burn into the prepared buffer; rasterio skips its own fill pass
+        return rasterize(
+            shapes=zip(geoms, values.tolist()),
+            out=arr,
+            transform=transform,
+            all_touched=self.config.all_touched,
+        )
+
+    def _write_tiled(
+        self, geoms: gpd.GeoSeries, values, out_tif_path: Path, profile: dict
+    ) -> None:
+        """
+        Rasterize geoms (already cleaned and in the grid CRS) one row of output
+        blocks at a time, so only a block row's worth of pixels is ever held in
+        memory.
+        """
+        geom_arr = geoms.to_numpy()
+        values = np.broadcast_to(np.asarray(values), (len(geom_arr),))
+
+        # Drop geometries whose bbox misses the grid before building the index,
+        # so the tree (and every window query) only covers what can be burned
+        xmin, ymin, xmax, ymax = shapely.bounds(geom_arr).T
+        e = self.extent
+        on_grid = (
+            (xmin <= e.xmax) & (xmax >= e.xmin) & (ymin <= e.ymax) & (ymax >= e.ymin)
+        )
+        if not on_grid.all():
+            geoms = geoms.iloc[on_grid]
+            geom_arr = geom_arr[on_grid]
+            values = values[on_grid]
+        sindex = geoms.sindex
+
+        # Match every tile against the index in one bulk query. Pairs are
+        # ordered by tile, then geometry. Tiles with no hits are never written:
+        # GDAL fills never-written tiles with nodata on close.
+        offsets = self._tile_offsets()
+        tile_boxes = shapely.box(*self._tile_bounds(offsets).T)
+        tile_idx, geom_idx = sindex.query(tile_boxes, predicate="intersects")
+        order = np.lexsort((geom_idx, tile_idx))
+        tile_idx, hit_geoms = tile_idx[order], geom_idx[order]
+        hit_tiles, starts = np.unique(tile_idx, return_index=True)
+        stops = np.append(starts[1:], len(tile_idx))
+
+        # Tiles are row-major, so each block row's hit tiles are contiguous.
+        # Every geometry is burned once per block row it touches, across the
+        # span of that row's hit tiles, rather than once per tile: a large
+        # polygon costs one pass over its edges per block row, not one per
+        # tile. (Clipping geometries to each tile would be cheaper still, but
+        # the cut edges are re-interpolated from new end points, which moves
+        # crossings that fall exactly on pixel centres and breaks parity with
+        # GDAL's fill.)
+        bands, band_starts = np.unique(offsets[hit_tiles, 1], return_index=True)
+        band_stops = np.append(band_starts[1:], len(hit_tiles))
+
+        # Burning and block encoding overlap: a finished block row is handed
+        # to a single writer thread, one block at a time, while the next row
+        # is burned. At most one row is in flight, so memory stays at two.
+        with (
+            self._open_output(out_tif_path, profile) as dst,
+            ThreadPoolExecutor(max_workers=1) as writer,
+        ):
+            pending = []
+            for row_off, b0, b1 in zip(bands.tolist(), band_starts, band_stops):
+                tiles = offsets[hit_tiles[b0:b1]]
+                # np.unique sorts, so geometries keep their burn order
+                # (overlap priority)
+                idx = np.unique(hit_geoms[starts[b0] : stops[b1 - 1]])
+                col_off = int(tiles[0, 0])
+                win = Window(
+                    col_off,
+                    row_off,
+                    int(tiles[-1, 0] + tiles[-1, 2]) - col_off,
+                    int(tiles[0, 3]),
+                )
+                arr = self._burn(
+                    geom_arr[idx],
+                    values[idx],
+                    out_shape=(win.height, win.width),
+                    transform=windows.transform(win, self.transform),
+                    fill=profile["nodata"],
+                    dtype=profile["dtype"],
+                )
+                for f in pending:
+                    f.result()  # also re-raises any write error
+                pending = [
+                    writer.submit(
+                        dst.write,
+                        arr[:, col - col_off : col - col_off + width],
+                        1,
+                        window=Window(col, row_off, width, win.height),
+                    )
+                    for col, width in tiles[:, [0, 2]].tolist()
+                ]
+            for f in pending:
+                f.result()
 
     # ----------------------------
     # Method 1: binary rasterize (0/1)
@@ -206,31 +755,65 @@ class RasterGrid:
         geojson_path = Path(geojson_path)
         out_tif_path = Path(out_tif_path)
 
-        gdf = gpd.read_file(geojson_path)
-        if gdf.crs is None:
-            gdf = gdf.set_crs(geojson_crs_if_missing)
+        gdf = _read_vector(geojson_path, [], geojson_crs_if_missing)
 
         gdf = _clean_polygons(gdf)
-        gdf = gdf.to_crs(self.crs)
+        gdf = self._reproject(gdf)
 
-        shapes = (
-            (geom, burn_value)
-            for geom in gdf.geometry
-            if geom is not None and not geom.is_empty
+        profile = self._packed(
+            dict(self._base_profile), max(burn_value, self.config.nodata)
         )
+        self._write_tiled(gdf.geometry, burn_value, out_tif_path, profile)
 
-        arr = rasterize(
-            shapes=shapes,
-            out_shape=(self.height, self.width),
-            fill=self.config.nodata,
-            transform=self.transform,
-            all_touched=self.config.all_touched,
-            dtype=self.config.dtype,
+        return out_tif_path
+
+    # ----------------------------
+    # Method 1b: rasterize a stream of (geometry, value) pairs
+    # ----------------------------
+
+    def rasterize_features_stream(
+        self,
+        shapes: Iterable,
+        out_tif_path: PathLike,
+        crs: Union[str, CRS] = "EPSG:3005",
+        nodata: Optional[int] = None,
+        dtype: Optional[str] = None,
+    ) -> Path:
+        """
+        Rasterize (geometry, value) pairs onto THIS grid.
+        Background = nodata (defaults to config.nodata).
+
+        Geometries are in ``crs`` (BC Albers, the BCGW's native SRID, by
+        default), so they can come straight from a database cursor without an
+        intermediate GeoJSON file. The pairs are gathered into a geometry array
+        and one contiguous value array, filtered/repaired and reprojected like
+        rasterize_geojson_binary, and then burned block by block like the other
+        methods.
+        """
+        out_tif_path = Path(out_tif_path)
+
+        out_dtype = dtype if dtype is not None else self.config.dtype
+        out_nodata = nodata if nodata is not None else self.config.nodata
+
+        geom_list, value_list = [], []
+        for geom, value in shapes:
+            geom_list.append(geom)
+            value_list.append(value)
+        gdf = gpd.GeoDataFrame(
+            {"value": value_list},
+            geometry=gpd.GeoSeries(np.array(geom_list, dtype=object), crs=crs),
         )
+        # Same filtering/repair as the GeoJSON methods, so invalid source
+        # polygons burn the same whichever way they arrive
+        if len(gdf):
+            gdf = self._reproject(_clean_polygons(gdf))
+        geoms = gdf.geometry
+        values = np.ascontiguousarray(gdf["value"].to_numpy(), dtype=out_dtype)
 
-        out_tif_path.parent.mkdir(parents=True, exist_ok=True)
-        with rasterio.open(out_tif_path, "w", **self.profile()) as dst:
-            dst.write(arr, 1)
+        profile = dict(self._base_profile, dtype=out_dtype, nodata=out_nodata)
+        profile = self._packed(profile, max(int(values.max(initial=0)), out_nodata))
+
+        self._write_tiled(geoms, values, out_tif_path, profile)
 
         return out_tif_path
 
@@ -247,9 +830,9 @@ class RasterGrid:
         nodata: Optional[int] = None,
         dtype: Optional[str] = None,
         # class rules (defaults match your current logic)
-        not_forage_value: int = 0,        # <40
-        functional_value: int = 2,        # 40-79
-        high_quality_value: int = 1,      # >=80
+        not_forage_value: int = 0,  # <40
+        functional_value: int = 2,  # 40-79
+        high_quality_value: int = 1,  # >=80
         min_functional: float = 40.0,
         min_high_quality: float = 80.0,
     ) -> Path:
@@ -265,50 +848,42 @@ class RasterGrid:
         geojson_path = Path(geojson_path)
         out_tif_path = Path(out_tif_path)
 
-        gdf = gpd.read_file(geojson_path)
-        if gdf.crs is None:
-            gdf = gdf.set_crs(geojson_crs_if_missing)
+        gdf = _read_vector(geojson_path, [age_field], geojson_crs_if_missing)
 
         gdf = _clean_polygons(gdf)
-        gdf = gdf.to_crs(self.crs)
+        gdf = self._reproject(gdf)
 
-        # coerce age to numeric
-        gdf[age_field] = gdf[age_field].replace("", np.nan)
-        gdf[age_field] = gdf[age_field].astype(float)
+        # coerce age to numeric (kept as an array; no columns written back to gdf)
+        ages = gdf[age_field].replace("", np.nan).to_numpy(dtype=float)
 
-        # build class column
-        cls_col = "forage_cls"
-        gdf[cls_col] = not_forage_value
-        gdf.loc[(gdf[age_field] >= min_functional) & (gdf[age_field] < min_high_quality), cls_col] = functional_value
-        gdf.loc[(gdf[age_field] >= min_high_quality), cls_col] = high_quality_value
-
-        # overlap priority: low->high so high overwrites
-        gdf = gdf.sort_values(cls_col, ascending=True)
+        # class per feature: bin each age, then map bin -> class value
+        bins = np.searchsorted(
+            [min(min_functional, min_high_quality), min_high_quality],
+            ages,
+            side="right",
+        )
+        bins[np.isnan(ages)] = 0  # missing age -> not forage
+        lut = np.array(
+            [not_forage_value, functional_value, high_quality_value], dtype=np.int32
+        )
+        cls_arr = lut[bins]
 
-        shapes = (
-            (geom, int(val))
-            for geom, val in zip(gdf.geometry, gdf[cls_col])
-            if geom is not None and not geom.is_empty
+        # overlap priority: worst->best so better overwrites worse. Only three
+        # class values, so bucket them (stable, O(N)) rather than sorting.
+        # Only the geometry column is reordered, not every attribute.
+        priority = dict.fromkeys(
+            (not_forage_value, functional_value, high_quality_value)
         )
+        order = np.concatenate([np.flatnonzero(cls_arr == v) for v in priority])
+        geoms = gdf.geometry.iloc[order]
+        cls_arr = cls_arr[order]  # fancy indexing: already a fresh contiguous array
 
         out_dtype = dtype if dtype is not None else self.config.dtype
         out_nodata = nodata if nodata is not None else self.config.nodata
 
-        arr = rasterize(
-            shapes=shapes,
-            out_shape=(self.height, self.width),
-            fill=out_nodata,
-            transform=self.transform,
-            all_touched=self.config.all_touched,
-            dtype=out_dtype,
-        )
-
-        profile = self.profile()
-        profile["dtype"] = out_dtype
-        profile["nodata"] = out_nodata
+        profile = dict(self._base_profile, dtype=out_dtype, nodata=out_nodata)
+        profile = self._packed(profile, max(lut.max(), out_nodata))
 
-        out_tif_path.parent.mkdir(parents=True, exist_ok=True)
-        with rasterio.open(out_tif_path, "w", **profile) as dst:
-            dst.write(arr, 1)
+        self._write_tiled(geoms, cls_arr, out_tif_path, profile)
 
         return out_tif_path
@@ -78,8 +78,10 @@ clipped AS (
 SELECT
     c.feature_id,
     c.proj_age_1,
-    SDO_UTIL.TO_GEOJSON(
-        SDO_CS.TRANSFORM(c.final_geom, 4326)
-    ) AS geom_geojson
+    -- simplified WKB in BC Albers: smaller over the wire than GeoJSON and
+    -- needs no reprojection before rasterizing
+    SDO_UTIL.TO_WKBGEOMETRY(
+        SDO_UTIL.SIMPLIFY(c.final_geom, :simplify_tol, :tol)
+    ) AS geom_wkb
 FROM clipped c
 WHERE c.final_geom IS NOT NULL
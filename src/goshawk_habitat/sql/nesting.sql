@@ -99,8 +99,10 @@ SELECT
     c.site_index,
     c.bec_zone_code,
     c.bec_subzone,
-    SDO_UTIL.TO_GEOJSON(
-        SDO_CS.TRANSFORM(c.final_geom, 4326)
-    ) AS geom_geojson
+    -- simplified WKB in BC Albers: smaller over the wire than GeoJSON and
+    -- needs no reprojection before rasterizing
+    SDO_UTIL.TO_WKBGEOMETRY(
+        SDO_UTIL.SIMPLIFY(c.final_geom, :simplify_tol, :tol)
+    ) AS geom_wkb
 FROM clipped c
 WHERE c.final_geom IS NOT NULL
@@ -61,6 +61,6 @@ final AS (
 SELECT
   f.feature_id,
   f.proj_age_1,
-  SDO_UTIL.TO_WKBGEOMETRY(f.final_geom) AS geom_wkb
+  SDO_UTIL.TO_WKBGEOMETRY(SDO_UTIL.SIMPLIFY(f.final_geom, :simplify_tol, :tol)) AS geom_wkb
 FROM final f
 WHERE f.final_geom IS NOT NULL
\ No newline at end of file
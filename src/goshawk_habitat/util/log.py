@@ -0,0 +1,37 @@
+"""
+Run logging shared by the workflow scripts.
+"""
+
+import logging
+from pathlib import Path
+
+logger = logging.getLogger("goshawk")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+def configure_logging(log_file: Path) -> None:
+    """
+    Send log_event output to log_file through a single FileHandler that keeps
+    the file open, replacing any handler from a previous call.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    # delay=True so re-imports in spawned workers don't create empty log files
+    handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    )
+    logger.addHandler(handler)
+
+
+def log_event(message: str) -> None:
+    """
+    Write a timestamped message to the run log.
+
+    :param message: Message to log
+    :type message: str
+    """
+    logger.info(message)
@@ -0,0 +1,92 @@
+import datetime as dt
+import json
+
+import pytest
+import shapely
+
+from goshawk_habitat.io import geojson
+
+SQUARE = shapely.box(1_000_000, 1_000_000, 1_000_030, 1_000_030)
+TRIANGLE = shapely.Polygon([(0, 0), (30, 0), (0, 30)])
+
+
+def _load(path):
+    with path.open("rb") as f:
+        return json.load(f)
+
+
+def _wkb_rows():
+    return [
+        [
+            (1, "AT", dt.date(2024, 5, 1), shapely.to_wkb(SQUARE)),
+            (2, None, None, None),  # null geometry is skipped
+        ],
+        [(3, "SBS", dt.date(2023, 1, 2), shapely.to_wkb(TRIANGLE))],
+    ]
+
+
+def test_wkb_rows_write_crs_and_iso_dates(tmp_path):
+    out = tmp_path / "out.geojson"
+
+    geojson.generate_geojson(
+        ["FEATURE_ID", "BEC", "SURVEYED", "GEOM_WKB"], _wkb_rows(), out
+    )
+
+    fc = _load(out)
+    assert fc["crs"]["properties"]["name"] == "urn:ogc:def:crs:EPSG::3005"
+    assert [f["properties"] for f in fc["features"]] == [
+        {"FEATURE_ID": 1, "BEC": "AT", "SURVEYED": "2024-05-01"},
+        {"FEATURE_ID": 3, "BEC": "SBS", "SURVEYED": "2023-01-02"},
+    ]
+    geoms = [shapely.from_geojson(json.dumps(f["geometry"])) for f in fc["features"]]
+    assert geoms[0].equals(SQUARE) and geoms[1].equals(TRIANGLE)
+
+
+def test_geojson_text_rows_are_spliced_without_crs(tmp_path):
+    out = tmp_path / "out.geojson"
+    rows = [[(7, shapely.to_geojson(TRIANGLE)), (8, None)]]
+
+    geojson.generate_geojson(["ID", "GEOM_GEOJSON"], rows, out)
+
+    fc = _load(out)
+    assert "crs" not in fc
+    assert len(fc["features"]) == 1
+    assert fc["features"][0]["properties"] == {"ID": 7}
+    assert fc["features"][0]["geometry"] == json.loads(shapely.to_geojson(TRIANGLE))
+
+
+def test_oracle_built_features_are_joined(tmp_path):
+    out = tmp_path / "out.geojson"
+    feature = {"type": "Feature", "geometry": None, "properties": {"ID": 1}}
+    batches = [[(json.dumps(feature),), (None,)], [], [(json.dumps(feature),)]]
+
+    geojson.generate_geojson(["FEATURE_JSON"], batches, out)
+
+    assert _load(out) == {"type": "FeatureCollection", "features": [feature, feature]}
+
+
+def test_empty_result_is_a_valid_collection(tmp_path):
+    out = tmp_path / "out.geojson"
+
+    geojson.generate_geojson(["ID", "GEOM_WKB"], [], out)
+
+    assert _load(out)["features"] == []
+
+
+def test_missing_geometry_column_raises(tmp_path):
+    with pytest.raises(ValueError, match="geom_geojson"):
+        geojson.generate_geojson(["ID"], [[(1,)]], tmp_path / "out.geojson")
+
+
+def test_arrow_writer_matches_row_writer(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    cols = ["FEATURE_ID", "BEC", "SURVEYED", "GEOM_WKB"]
+    tables = [
+        pa.table({c: [r[i] for r in batch] for i, c in enumerate(cols)})
+        for batch in _wkb_rows()
+    ]
+
+    geojson.generate_geojson(cols, _wkb_rows(), tmp_path / "rows.geojson")
+    geojson.generate_geojson_arrow(tables, tmp_path / "arrow.geojson")
+
+    assert _load(tmp_path / "arrow.geojson") == _load(tmp_path / "rows.geojson")
@@ -0,0 +1,129 @@
+import oracledb
+import pytest
+
+import goshawk_habitat.db.oracle as bcgw
+
+
+class _LOB(oracledb.LOB):
+    """Stand-in for a LOB locator the driver returns when fetch_lobs is on."""
+
+    def __init__(self, value):
+        self._value = value
+
+    def __del__(self):
+        pass
+
+    def read(self):
+        return self._value
+
+
+class FakeCursor:
+    """
+    Minimal cursor that mimics the driver's LOB handling: CLOB/BLOB values
+    come back as locators unless oracledb.defaults.fetch_lobs is False.
+    """
+
+    def __init__(self, conn, cols, rows):
+        self.conn = conn
+        self.cols = cols
+        self.rows = rows
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        self.description = [(c, None) for c in self.cols]
+        self._pending = list(self.rows)
+
+    def fetchmany(self):
+        batch = self._pending[: self.arraysize]
+        self._pending = self._pending[self.arraysize :]
+        if oracledb.defaults.fetch_lobs:
+            batch = [
+                tuple(_LOB(v) if isinstance(v, (str, bytes)) else v for v in row)
+                for row in batch
+            ]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.executed = []
+        self.cursors = []
+        self.outputtypehandler = None
+
+    def cursor(self):
+        cur = FakeCursor(self, self.cols, self.rows)
+        self.cursors.append(cur)
+        return cur
+
+
+COLS = ["OBJECTID", "GEOM_WKB", "GEOM_GEOJSON"]
+
+
+def _rows(n):
+    # BLOB well past the 2000-byte RAW define limit, plus a CLOB column
+    return [
+        (i, b"\x01" * 5000, '{"type": "Point", "coordinates": [0, 0]}')
+        for i in range(n)
+    ]
+
+
+def test_run_sql_never_returns_lobs():
+    conn = FakeConnection(COLS, _rows(25))
+
+    cols, rows = bcgw.run_sql(conn, "TSA.sql", {"tsa_id": 1}, arraysize=10)
+
+    assert cols == COLS
+    assert len(rows) == 25
+    assert not any(isinstance(v, oracledb.LOB) for row in rows for v in row)
+    assert all(len(row[1]) == 5000 for row in rows)
+
+
+def test_fake_cursor_returns_lobs_when_fetch_lobs_enabled(monkeypatch):
+    # Guards the test above against passing vacuously
+    monkeypatch.setattr(oracledb.defaults, "fetch_lobs", True)
+    conn = FakeConnection(COLS, _rows(3))
+
+    _, rows = bcgw.run_sql(conn, "TSA.sql")
+
+    assert all(isinstance(row[1], oracledb.LOB) for row in rows)
+
+
+def test_stream_does_not_install_output_type_handler():
+    conn = FakeConnection(COLS, _rows(3))
+
+    cols, batches = bcgw.run_sql_stream(conn, "TSA.sql")
+    list(batches)
+
+    assert conn.outputtypehandler is None
+    assert conn.cursors[0].closed
+
+
+@pytest.mark.parametrize("max_rows", [1, 10, 11, 40])
+def test_run_sql_caps_rows_and_closes_cursor(max_rows):
+    conn = FakeConnection(COLS, _rows(25))
+
+    _, rows = bcgw.run_sql(conn, "TSA.sql", arraysize=10, max_rows=max_rows)
+
+    assert [r[0] for r in rows] == list(range(min(max_rows, 25)))
+    assert conn.cursors[0].closed
+
+
+def test_arrow_fetch_needs_fetch_df_batches(monkeypatch):
+    conn = FakeConnection(COLS, [])
+    assert not bcgw.supports_arrow_fetch(conn)
+
+    conn.fetch_df_batches = lambda **kwargs: iter(())
+    monkeypatch.setattr(bcgw, "pa", object())
+    assert bcgw.supports_arrow_fetch(conn)
+
+    monkeypatch.setattr(bcgw, "pa", None)
+    assert not bcgw.supports_arrow_fetch(conn)
@@ -0,0 +1,316 @@
+"""
+Pixel-for-pixel parity between RasterGrid output and rasterio.features.rasterize.
+
+The numba scanline kernel (_scanline_rasterize) reproduces GDAL's polygon
+fill, including its tie rules for vertices and edges that fall exactly on
+pixel centres; these tests pin that down. Without numba the same tests run
+against the rasterio fallback.
+"""
+
+import json
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+import shapely
+from rasterio.features import rasterize
+
+from goshawk_habitat.rast import raster
+
+X0, Y0 = 1_000_000.0, 1_000_000.0
+
+
+def _grid(pixel_size=30.0, cols=400, rows=300, x_shift=0, **config):
+    config = {"nodata": 255, "blockxsize": 64, "blockysize": 64, **config}
+    xmin = X0 - x_shift * pixel_size
+    return raster.RasterGrid(
+        raster.GridConfig(pixel_size=pixel_size, **config),
+        raster.GridExtent(xmin, Y0, xmin + cols * pixel_size, Y0 + rows * pixel_size),
+    )
+
+
+def _random_polygons(n=300, seed=0):
+    """Star-shaped polygons, some with holes, some multipart."""
+    rng = np.random.default_rng(seed)
+    geoms = []
+    for i in range(n):
+        cx, cy = rng.uniform(X0 - 1000, X0 + 13000), rng.uniform(Y0 - 1000, Y0 + 10000)
+        k = rng.integers(3, 40)
+        ang = np.sort(rng.uniform(0, 2 * np.pi, k))
+        r = rng.uniform(50, 2000, k)
+        poly = shapely.make_valid(
+            shapely.Polygon(np.c_[cx + r * np.cos(ang), cy + r * np.sin(ang)])
+        )
+        if i % 5 == 0 and poly.geom_type == "Polygon":
+            poly = poly.difference(shapely.Point(cx, cy).buffer(100))
+        if i % 7 == 0 and poly.geom_type == "Polygon":
+            extra = shapely.box(cx + 3000, cy, cx + 3500, cy + 333)
+            poly = shapely.make_valid(shapely.MultiPolygon([poly, extra]))
+        if poly.geom_type in ("Polygon", "MultiPolygon"):
+            geoms.append(poly)
+    return np.array(geoms, dtype=object)
+
+
+def _lattice_polygons(pixel_size, n=300, seed=5):
+    """Polygons whose vertices sit on the half-pixel lattice (pixel corners and
+    centres), so every tie rule in the fill is exercised."""
+    rng = np.random.default_rng(seed)
+    geoms = []
+    for _ in range(n):
+        k = rng.integers(3, 12)
+        centre = rng.integers(0, 200, 2)
+        pts = (centre + rng.integers(-20, 20, (k, 2))) * pixel_size / 2 + (X0, Y0)
+        poly = shapely.make_valid(shapely.Polygon(pts))
+        if poly.geom_type in ("Polygon", "MultiPolygon") and not poly.is_empty:
+            geoms.append(poly)
+    return np.array(geoms, dtype=object)
+
+
+def _expected(grid, geoms, values, fill):
+    return rasterize(
+        list(zip(geoms, np.asarray(values).tolist())),
+        out_shape=(grid.height, grid.width),
+        transform=grid.transform,
+        fill=fill,
+        all_touched=grid.config.all_touched,
+        dtype="uint8",
+    )
+
+
+def _read(path):
+    with rasterio.open(path) as src:
+        return src.read(1)
+
+
+@pytest.mark.parametrize("all_touched", [False, True])
+def test_stream_matches_rasterio(tmp_path, all_touched):
+    grid = _grid(all_touched=all_touched)
+    geoms = _random_polygons()
+    values = np.random.default_rng(1).integers(0, 3, len(geoms))
+
+    out = grid.rasterize_features_stream(
+        zip(geoms, values.tolist()), tmp_path / "out.tif"
+    )
+
+    np.testing.assert_array_equal(_read(out), _expected(grid, geoms, values, 255))
+
+
+@pytest.mark.parametrize("pixel_size", [30.0, 25.0, 10.0])
+def test_half_pixel_lattice_ties_match_rasterio(tmp_path, pixel_size):
+    grid = _grid(
+        pixel_size,
+        cols=200,
+        rows=150,
+        x_shift=7,
+        nodata=0,
+        blockxsize=32,
+        blockysize=16,
+    )
+    geoms = _lattice_polygons(pixel_size)
+    values = np.random.default_rng(6).integers(1, 200, len(geoms))
+
+    out = grid.rasterize_features_stream(
+        zip(geoms, values.tolist()), tmp_path / "out.tif"
+    )
+
+    np.testing.assert_array_equal(_read(out), _expected(grid, geoms, values, 0))
+
+
+def test_ring_orientation_does_not_matter(tmp_path):
+    grid = _grid(nodata=0)
+    geoms = _lattice_polygons(30.0)
+    ccw = shapely.orient_polygons(geoms, exterior_cw=False)
+    cw = shapely.orient_polygons(geoms, exterior_cw=True)
+
+    a = grid.rasterize_features_stream(((g, 1) for g in ccw), tmp_path / "ccw.tif")
+    b = grid.rasterize_features_stream(((g, 1) for g in cw), tmp_path / "cw.tif")
+
+    np.testing.assert_array_equal(_read(a), _read(b))
+    np.testing.assert_array_equal(
+        _read(a), _expected(grid, geoms, np.ones(len(geoms)), 0)
+    )
+
+
+@pytest.mark.skipif(raster.njit is None, reason="numba not installed")
+def test_scanline_kernel_matches_rasterio_on_full_grid():
+    grid = _grid(pixel_size=25.0, cols=200, rows=150, x_shift=7)
+    geoms = _lattice_polygons(25.0)
+    values = np.arange(len(geoms), dtype=np.uint8)
+
+    out = np.full((grid.height, grid.width), 255, np.uint8)
+    t = grid.transform
+    raster._scanline_rasterize(
+        *raster._flatten_polygons(geoms),
+        values,
+        out,
+        grid._inv_ps,
+        -t.c / grid.pixel_size,
+        t.f / grid.pixel_size,
+    )
+
+    np.testing.assert_array_equal(out, _expected(grid, geoms, values, 255))
+
+
+@pytest.mark.parametrize("cog", [False, True])
+@pytest.mark.parametrize("nodata", [0, 255])
+def test_binary_packed_output_matches_rasterio(tmp_path, cog, nodata):
+    if cog and raster.cog_translate is None:
+        pytest.skip("rio-cogeo not installed")
+    grid = _grid(nodata=nodata, packed_bits=1, cog=cog)
+    geoms = _random_polygons(seed=2)
+    src = tmp_path / "polys.geojson"
+    gpd.GeoDataFrame(geometry=geoms, crs="EPSG:3005").to_file(src)
+
+    out = grid.rasterize_geojson_binary(src, tmp_path / "out.tif", "EPSG:3005")
+
+    with rasterio.open(out) as ds:
+        nbits = ds.tags(1, ns="IMAGE_STRUCTURE").get("NBITS")
+        arr = ds.read(1)
+    assert nbits == ("1" if nodata == 0 else None)
+    np.testing.assert_array_equal(
+        arr, _expected(grid, geoms, np.ones(len(geoms)), nodata)
+    )
+
+
+def test_stream_and_geojson_repair_invalid_polygons_alike(tmp_path):
+    grid = _grid(cols=100, rows=100)
+    bowtie = shapely.Polygon(
+        [
+            (X0 + 100, Y0 + 100),
+            (X0 + 2900, Y0 + 2900),
+            (X0 + 2900, Y0 + 100),
+            (X0 + 100, Y0 + 2900),
+        ]
+    )
+    src = tmp_path / "bowtie.geojson"
+    gpd.GeoDataFrame(geometry=[bowtie], crs="EPSG:3005").to_file(src)
+
+    a = grid.rasterize_features_stream([(bowtie, 1)], tmp_path / "stream.tif")
+    b = grid.rasterize_geojson_binary(src, tmp_path / "file.tif", "EPSG:3005")
+
+    assert (_read(a) == 1).any()
+    np.testing.assert_array_equal(_read(a), _read(b))
+
+
+def test_cog_without_rio_cogeo_warns(monkeypatch):
+    monkeypatch.setattr(raster, "cog_translate", None)
+
+    with pytest.warns(RuntimeWarning, match="rio-cogeo"):
+        _grid(cog=True)
+
+
+def test_stream_reprojects_from_source_crs(tmp_path):
+    # Same polygons, one copy handed over in UTM 10N instead of BC Albers
+    grid = _grid(cols=100, rows=100, nodata=0)
+    geoms = shapely.buffer(
+        shapely.points([(X0 + 900, Y0 + 1200), (X0 + 2000, Y0 + 2100)]), 500
+    )
+    to_utm = raster._get_transformer(
+        grid._pyproj_crs.to_wkt(), raster.CRS.from_epsg(26910).to_wkt()
+    )
+    utm = shapely.transform(geoms, lambda xy: np.column_stack(to_utm.transform(*xy.T)))
+
+    a = grid.rasterize_features_stream(((g, 1) for g in geoms), tmp_path / "a.tif")
+    b = grid.rasterize_features_stream(
+        ((g, 1) for g in utm), tmp_path / "b.tif", crs="EPSG:26910"
+    )
+
+    assert (_read(a) == 1).sum() > 1000
+    np.testing.assert_array_equal(_read(a), _read(b))
+
+
+@pytest.mark.parametrize("all_touched", [False, True])
+def test_large_polygon_spanning_many_tiles_matches_rasterio(tmp_path, all_touched):
+    # One dissolved, many-vertex MultiPolygon across hundreds of 16x16 blocks,
+    # with holes and gaps so some blocks in a row are skipped
+    grid = _grid(blockxsize=16, blockysize=16, nodata=0, all_touched=all_touched)
+    big = shapely.union_all(
+        np.concatenate([_random_polygons(seed=3), _lattice_polygons(30.0)])
+    )
+    big = shapely.segmentize(big, 10.0)
+    assert shapely.get_num_coordinates(big) > 10_000
+
+    out = grid.rasterize_features_stream([(big, 1)], tmp_path / "out.tif")
+
+    np.testing.assert_array_equal(_read(out), _expected(grid, [big], [1], 0))
+
+
+def _age_squares(tmp_path, ages, size=600.0, step=900.0):
+    """GeoJSON of disjoint squares along a row, one per PROJ_AGE_1 value
+    (written raw so blank strings and nulls reach the reader as-is)."""
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"PROJ_AGE_1": age},
+            "geometry": shapely.geometry.mapping(
+                shapely.box(X0 + i * step, Y0, X0 + i * step + size, Y0 + size)
+            ),
+        }
+        for i, age in enumerate(ages)
+    ]
+    src = tmp_path / "ages.geojson"
+    crs = {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::3005"}}
+    src.write_text(
+        json.dumps({"type": "FeatureCollection", "crs": crs, "features": features})
+    )
+    return src
+
+
+def _class_at_squares(grid, path, n, size=600.0, step=900.0):
+    """Burned value at the centre of each of the n squares from _age_squares."""
+    arr = _read(path)
+    xs = X0 + np.arange(n) * step + size / 2
+    rows, cols = rasterio.transform.rowcol(
+        grid.transform, xs, np.full(n, Y0 + size / 2)
+    )
+    return arr[rows, cols].tolist()
+
+
+@pytest.mark.filterwarnings("ignore:Could not parse column")
+def test_age_classes_map_missing_ages_and_boundaries(tmp_path):
+    grid = _grid(cols=400, rows=40)
+    ages = [None, "", 0, 39.9, 40, 79.9, 80, 250]
+    src = _age_squares(tmp_path, ages)
+
+    out = grid.rasterize_geojson_age_classes(src, tmp_path / "out.tif")
+
+    assert _class_at_squares(grid, out, len(ages)) == [0, 0, 0, 0, 2, 2, 1, 1]
+
+
+def test_age_classes_clamp_inverted_thresholds(tmp_path):
+    # min_functional above min_high_quality: there is no functional band, and
+    # everything at or over min_high_quality is high quality
+    grid = _grid(cols=400, rows=40)
+    ages = [10, 59, 60, 70, 90]
+    src = _age_squares(tmp_path, ages)
+
+    out = grid.rasterize_geojson_age_classes(
+        src,
+        tmp_path / "out.tif",
+        min_functional=80,
+        min_high_quality=60,
+    )
+
+    assert _class_at_squares(grid, out, len(ages)) == [0, 0, 1, 1, 1]
+
+
+def test_age_classes_overlap_priority(tmp_path):
+    # Listed best-first, so a plain file-order burn would let the worst class
+    # win every overlap
+    grid = _grid()
+    geoms = _random_polygons(seed=4)
+    ages = np.random.default_rng(7).choice([10.0, 50.0, 90.0], len(geoms))
+    order = np.argsort(-ages, kind="stable")
+    geoms, ages = geoms[order], ages[order]
+    src = tmp_path / "ages.geojson"
+    gpd.GeoDataFrame({"PROJ_AGE_1": ages}, geometry=geoms, crs="EPSG:3005").to_file(src)
+
+    out = grid.rasterize_geojson_age_classes(src, tmp_path / "out.tif")
+
+    # not_forage (0) first, then functional (2), then high quality (1) on top
+    classes = np.select([ages < 40, ages < 80], [0, 2], 1)
+    burn = np.argsort(ages, kind="stable")
+    arr = _read(out)
+    np.testing.assert_array_equal(arr, _expected(grid, geoms[burn], classes[burn], 255))
+    assert set(np.unique(arr).tolist()) == {0, 1, 2, 255}
@@ -0,0 +1,95 @@
+import datetime as dt
+import os
+
+import oracledb
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from goshawk_habitat.cache import sql_cache  # noqa: E402
+
+# cursor.description entries: (name, type, display, internal, precision, scale, null)
+DESCRIPTION = [
+    ("FEATURE_ID", oracledb.DB_TYPE_NUMBER, None, None, 10, 0, False),
+    ("PROJ_AGE_1", oracledb.DB_TYPE_NUMBER, None, None, 0, -127, True),
+    ("BEC_ZONE_CODE", oracledb.DB_TYPE_VARCHAR, None, None, None, None, True),
+    ("SURVEYED", oracledb.DB_TYPE_DATE, None, None, None, None, True),
+    ("GEOM_WKB", oracledb.DB_TYPE_BLOB, None, None, None, None, True),
+]
+COLS = [c[0] for c in DESCRIPTION]
+# The first batch has no BEC zone and only whole-number ages, so types
+# inferred from it alone would not fit the later batches
+BATCHES = [
+    [(1, 80, None, None, b"\x01\x03"), (2, None, None, None, b"\x01\x06")],
+    [(3, 120.5, "SBS", dt.datetime(2024, 5, 1), None)],
+    [(4, 41, "ESSF", dt.datetime(2023, 1, 2), b"\x01\x03")],
+]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the BCGW query with a canned three-batch result and count runs."""
+    calls = []
+
+    def fake_stream(conn, sql_filename, params=None, batch=5000, describe=False):
+        calls.append((sql_filename, params))
+        return (DESCRIPTION if describe else COLS), iter(BATCHES)
+
+    monkeypatch.setattr(sql_cache, "run_sql_stream", fake_stream)
+    return calls
+
+
+def _rows(batches):
+    return [r for batch in batches for r in batch]
+
+
+def test_miss_streams_batches_then_hit_reads_them_back(tmp_path, calls):
+    params = {"tsa_id": 363, "tol": 1}
+
+    cols, batches = sql_cache.run_sql_cached(
+        None, "nesting.sql", params, cache_dir=tmp_path
+    )
+    assert cols == COLS
+    assert list(batches) == BATCHES  # handed on batch by batch, unchanged
+
+    cols, batches = sql_cache.run_sql_cached(
+        None, "nesting.sql", params, cache_dir=tmp_path, batch=2
+    )
+    batches = list(batches)
+
+    assert len(calls) == 1
+    assert cols == COLS
+    assert [len(b) for b in batches] == [2, 2]
+    assert _rows(batches) == _rows(BATCHES)
+    assert [p.suffix for p in tmp_path.iterdir()] == [".parquet"]
+
+
+def test_abandoned_read_leaves_no_entry(tmp_path, calls):
+    _, batches = sql_cache.run_sql_cached(None, "nesting.sql", cache_dir=tmp_path)
+    next(batches)
+    batches.close()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_params_are_part_of_the_key(tmp_path, calls):
+    for tsa_id in (363, 364):
+        _, batches = sql_cache.run_sql_cached(
+            None, "nesting.sql", {"tsa_id": tsa_id}, cache_dir=tmp_path
+        )
+        list(batches)
+
+    assert len(calls) == 2
+
+
+def test_stale_entries_are_refreshed(tmp_path, calls):
+    for _ in range(2):
+        _, batches = sql_cache.run_sql_cached(
+            None, "nesting.sql", cache_dir=tmp_path, ttl_hours=1
+        )
+        list(batches)
+        (entry,) = tmp_path.iterdir()
+        two_hours_ago = entry.stat().st_mtime - 2 * 3600
+        os.utime(entry, (two_hours_ago, two_hours_ago))
+
+    assert len(calls) == 2